@@ -6,7 +6,7 @@ from freezegun import freeze_time
 
 from tests.helpers import pyicu_sensitive
 from todoman.cli import cli
-from todoman.formatters import rgb_to_ansi
+from todoman.formatters import _format_table, DefaultFormatter, rgb_to_ansi
 
 
 @pyicu_sensitive
@@ -52,6 +52,18 @@ def test_format_priority_compact(default_formatter):
         assert default_formatter.format_priority_compact(i) == '!'
 
 
+def test_parse_priority(default_formatter):
+    assert default_formatter.parse_priority(None) is None
+    assert default_formatter.parse_priority('') is None
+    assert default_formatter.parse_priority('none') == 0
+    assert default_formatter.parse_priority('high') == 4
+    assert default_formatter.parse_priority('medium') == 5
+    assert default_formatter.parse_priority('low') == 9
+
+    with pytest.raises(ValueError):
+        default_formatter.parse_priority('urgent')
+
+
 def test_format_date(default_formatter):
     assert default_formatter.format_datetime(date(2017, 3, 4)) == '2017-03-04'
 
@@ -61,6 +73,17 @@ def test_format_datetime(default_formatter):
         '2017-03-04 17:00'
 
 
+def test_format_datetime_custom_format():
+    formatter = DefaultFormatter(
+        date_format='%d/%m/%Y',
+        time_format='%I:%M %p',
+        tz_override=pytz.timezone('CET'),
+    )
+    assert formatter.format_datetime(date(2017, 3, 4)) == '04/03/2017'
+    assert formatter.format_datetime(datetime(2017, 3, 4, 17, 00)) == \
+        '04/03/2017 05:00 PM'
+
+
 def test_detailed_format(runner, todo_factory):
     todo_factory(
         description='Test detailed formatting\n'
@@ -114,6 +137,16 @@ def test_parse_datetime(default_formatter):
     assert default_formatter.parse_datetime(None) is None
 
 
+def test_parse_relative_datetime_not_stale(default_formatter):
+    with freeze_time('2017-03-04'):
+        first = default_formatter.parse_datetime('tomorrow')
+    with freeze_time('2017-03-10'):
+        second = default_formatter.parse_datetime('tomorrow')
+
+    assert first.date() == date(2017, 3, 5)
+    assert second.date() == date(2017, 3, 11)
+
+
 def test_humanized_parse_datetime(humanized_formatter):
     tz = pytz.timezone('CET')
 
@@ -121,6 +154,12 @@ def test_humanized_parse_datetime(humanized_formatter):
     dt = datetime(2017, 3, 6, 20, 17).replace(tzinfo=tz)
 
     assert humanized_formatter.format_datetime(dt) == '2 hours ago'
+
+    dt = datetime(2017, 3, 7, 1, 17).replace(tzinfo=tz)
+    assert humanized_formatter.format_datetime(dt) == 'in 3 hours'
+
+    dt = humanized_formatter.now
+    assert humanized_formatter.format_datetime(dt) == 'now'
     assert humanized_formatter.format_datetime(None) == ''
 
 
@@ -144,3 +183,26 @@ def test_rgb_to_ansi():
     assert rgb_to_ansi('#8ab6d2f') == '\x1b[38;2;138;182;210m'
     assert rgb_to_ansi('red') is None
     assert rgb_to_ansi('#8ab6d2') == '\x1b[38;2;138;182;210m'
+
+
+def test_format_table():
+    assert _format_table([]) == ''
+    assert _format_table([
+        [
+            ('1', '1'),
+            ('[ ]', '[ ]'),
+            ('', ''),
+            ('2017-03-04 ', '\x1b[31m2017-03-04\x1b[0m '),
+            ('Hi ', 'Hi '),
+        ],
+        [
+            ('12', '12'),
+            ('[X]', '[X]'),
+            ('!!', '!!'),
+            ('', ''),
+            ('Hello there', 'Hello there'),
+        ],
+    ]) == (
+        ' 1  [ ]      \x1b[31m2017-03-04\x1b[0m  Hi\n'
+        '12  [X]  !!              Hello there'
+    )
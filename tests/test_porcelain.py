@@ -198,3 +198,13 @@ def test_formatting_parsing_consitency():
 
     formatter = PorcelainFormatter(tz_override=tz)
     assert formatter.parse_datetime(formatter.format_datetime(dt)) == dt
+
+
+def test_porcelain_does_not_compute_now(todo_factory):
+    todo = todo_factory(due=datetime(2017, 3, 4, 17, 0, tzinfo=pytz.UTC))
+    formatter = PorcelainFormatter()
+
+    formatter.compact_multiple([todo])
+    formatter.detailed(todo)
+
+    assert formatter._now is None
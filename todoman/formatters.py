@@ -1,15 +1,55 @@
 import datetime
 import json
-from time import mktime
+import operator
+import re
+import time
+from functools import lru_cache
 
 import click
 import humanize
 import parsedatetime
 import pytz
 from dateutil.tz import tzlocal
-from tabulate import tabulate
 
 
+def _format_table(rows, right_align=(0,)):
+    """
+    Render ``rows`` as space-padded columns.
+
+    Each cell is a ``(text, styled)`` pair, where ``text`` is the plain text
+    (used to compute column widths) and ``styled`` is what actually gets
+    printed, possibly including ANSI escapes.
+
+    The output matches ``tabulate(rows, tablefmt='plain')`` for our tables
+    (cells are stripped and columns in ``right_align`` are right-justified),
+    but doesn't inspect every cell to guess its type or strip escapes.
+    """
+    if not rows:
+        return ''
+
+    rows = [
+        [(text.strip(), styled.strip()) for text, styled in row]
+        for row in rows
+    ]
+    widths = [
+        max(len(text) for text, styled in column) for column in zip(*rows)
+    ]
+
+    lines = []
+    for row in rows:
+        cells = []
+        for i, ((text, styled), width) in enumerate(zip(row, widths)):
+            padding = ' ' * (width - len(text))
+            if i in right_align:
+                cells.append(padding + styled)
+            else:
+                cells.append(styled + padding)
+        lines.append('  '.join(cells).rstrip())
+
+    return '\n'.join(lines)
+
+
+@lru_cache(maxsize=256)
 def rgb_to_ansi(colour):
     """
     Convert a string containing an RGB colour to ANSI escapes
@@ -17,17 +57,148 @@ def rgb_to_ansi(colour):
     if not colour or not colour.startswith('#'):
         return
 
-    r, g, b = colour[1:3], colour[3:5], colour[5:7]
-
-    if not len(r) == len(g) == len(b) == 2:
+    rgb = colour[1:7]
+    if len(rgb) != 6:
         return
 
-    return '\33[38;2;{!s};{!s};{!s}m'.format(
-        int(r, 16), int(g, 16), int(b, 16)
-    )
+    r, g, b = bytes.fromhex(rgb)
+    return '\33[38;2;{};{};{}m'.format(r, g, b)
+
+
+# Equivalent to click.style(text, fg='red'), without re-parsing arguments
+# for every todo.
+_RED_PREFIX = '\x1b[31m'
+_RESET = '\x1b[0m'
+
+# Priority representations, indexed by the iCalendar PRIORITY value (0-9).
+_PRIORITY_COMPACT = (
+    '', '!!!', '!!!', '!!!', '!!!', '!!', '!', '!', '!', '!'
+)
+_PRIORITY_NAMES = (
+    'none', 'high', 'high', 'high', 'high', 'medium',
+    'low', 'low', 'low', 'low',
+)
+_PRIORITY_VALUES = {
+    None: None,
+    '': None,
+    'low': 9,
+    'medium': 5,
+    'high': 4,
+    'none': 0,
+}
+
+# json.dumps builds a new encoder on every call when given options; porcelain
+# output always uses the same ones, so share a single encoder.
+_porcelain_encoder = json.JSONEncoder(indent=4, sort_keys=True)
+
+# Reads all the attributes porcelain output needs from a todo in one go.
+_porcelain_attributes = operator.attrgetter(
+    'is_completed',
+    'due',
+    'id',
+    'list.name',
+    'percent_complete',
+    'summary',
+    'priority',
+    'location',
+)
+
+_ISO_DATE_FORMAT = '%Y-%m-%d'
+_ISO_TIME_FORMAT = '%H:%M'
+_ISO_DATETIME_FORMAT = '%Y-%m-%d %H:%M'
+
+# These match (at least) anything strptime accepts for the formats above, so
+# a string that doesn't match can skip the (raising, hence slow) strptime
+# call altogether.
+_ISO_DATE_RE = re.compile(r'\d{4}-\d{1,2}-\s?\d{1,2}')
+_ISO_TIME_RE = re.compile(r'\d{1,2}:\d{1,2}')
+_ISO_DATETIME_RE = re.compile(r'\d{4}-\d{1,2}-\s?\d{1,2}\s+\d{1,2}:\d{1,2}')
+
+
+@lru_cache(maxsize=1024)
+def _cached_strptime(dt, fmt):
+    """
+    Return the naive datetime for ``dt`` parsed with ``fmt``.
+
+    Users tend to pass the same few strings over and over, so these are
+    memoized. Failed parses raise (and are not cached) as usual.
+    """
+    return datetime.datetime.strptime(dt, fmt)
+
+
+@lru_cache(maxsize=1024)
+def _date_timestamp(date):
+    """
+    Return the timestamp for local midnight at the start of ``date``.
+
+    Converting naive values goes through the system's timezone rules, and
+    many todos share the same due dates, so these are memoized.
+    """
+    return int(datetime.datetime.fromordinal(date.toordinal()).timestamp())
+
+
+@lru_cache(maxsize=1024)
+def _humanize_seconds(seconds, future):
+    """
+    Return a humanized representation of an offset of ``seconds`` from now.
+
+    Lots of todos share the same offsets (especially those due on the same
+    day), so these are memoized.
+    """
+    delta = humanize.naturaldelta(datetime.timedelta(seconds=seconds))
+    if delta == 'a moment':
+        return 'now'
+    return ('in {}' if future else '{} ago').format(delta)
+
+
+_parsedatetime_calendar = None
+
+
+def _get_parsedatetime_calendar():
+    """
+    Return a shared parsedatetime Calendar, creating it on first use.
+
+    Building a Calendar loads locale data and compiles plenty of regexes, so
+    we only do it once per process (and not at all if nothing is parsed).
+    """
+    global _parsedatetime_calendar
+    if _parsedatetime_calendar is None:
+        _parsedatetime_calendar = parsedatetime.Calendar(
+            version=parsedatetime.VERSION_CONTEXT_STYLE,
+        )
+    return _parsedatetime_calendar
+
+
+@lru_cache(maxsize=256)
+def _cached_pdt_parse(dt, source_time):
+    """
+    Parse ``dt`` with parsedatetime, relative to ``source_time``.
+
+    ``source_time`` is part of the cache key so that relative expressions
+    ("tomorrow", "in 2 hours") are never served stale.
+    """
+    rv, pd_ctx = _get_parsedatetime_calendar().parse(dt, source_time)
+    if not pd_ctx.hasDateOrTime:
+        return None
+    return datetime.datetime.fromtimestamp(time.mktime(rv))
 
 
 class DefaultFormatter:
+    # Formatters are hit once per todo (or more), so avoid a per-instance
+    # __dict__ and its slower attribute lookups.
+    __slots__ = (
+        'date_format',
+        'time_format',
+        'dt_separator',
+        'datetime_format',
+        'tz',
+        '_fast_date',
+        '_fast_datetime',
+        '_iso_formats',
+        '_now',
+        '_styled_database_names',
+    )
+
     def __init__(
         self,
         date_format='%Y-%m-%d',
@@ -43,12 +214,30 @@ class DefaultFormatter:
                    (date_format, time_format))
         )
 
+        # The default formats are rendered by hand, which is much cheaper
+        # than having strftime re-parse the format for each todo.
+        self._fast_date = date_format == _ISO_DATE_FORMAT
+        self._fast_datetime = self.datetime_format == _ISO_DATETIME_FORMAT
+        self._iso_formats = (
+            (date_format, time_format, self.datetime_format) ==
+            (_ISO_DATE_FORMAT, _ISO_TIME_FORMAT, _ISO_DATETIME_FORMAT)
+        )
+
         self.tz = tz_override or tzlocal()
-        self.now = datetime.datetime.now().replace(tzinfo=self.tz)
+        self._now = None
 
-        self._parsedatetime_calendar = parsedatetime.Calendar(
-            version=parsedatetime.VERSION_CONTEXT_STYLE,
-        )
+        self._styled_database_names = {}
+
+    @property
+    def now(self):
+        """The current time, determined the first time it's needed."""
+        if self._now is None:
+            self._now = datetime.datetime.now().replace(tzinfo=self.tz)
+        return self._now
+
+    @now.setter
+    def now(self, value):
+        self._now = value
 
     def simple_action(self, action, todo):
         return '{} "{}"'.format(action, todo.summary)
@@ -57,44 +246,68 @@ class DefaultFormatter:
         return self.compact_multiple([todo])
 
     def compact_multiple(self, todos, hide_list=False):
+        # Look everything up once, rather than once per todo. The current
+        # time is only needed if some todo can be overdue.
+        now_dt = now_d = None
+        datetime_type = datetime.datetime
+        format_datetime = self.format_datetime
+        format_priority_compact = self.format_priority_compact
+        format_database = self.format_database
+
         table = []
         for todo in todos:
-            completed = "X" if todo.is_completed else " "
+            todo_due = todo.due
+            is_completed = todo.is_completed
+
+            completed = "[X]" if is_completed else "[ ]"
             percent = todo.percent_complete or ''
             if percent:
                 percent = " ({}%)".format(percent)
-            priority = self.format_priority_compact(todo.priority)
-
-            due = self.format_datetime(todo.due)
-            now = (self.now
-                   if isinstance(todo.due, datetime.datetime)
-                   else self.now.date())
-            if todo.due and todo.due <= now and not todo.is_completed:
-                due = click.style(due, fg='red')
+            priority = format_priority_compact(todo.priority)
+
+            due = styled_due = format_datetime(todo_due)
+            if todo_due and not is_completed:
+                if now_dt is None:
+                    now_dt = self.now
+                    now_d = now_dt.date()
+                now = (now_dt
+                       if isinstance(todo_due, datetime_type)
+                       else now_d)
+                if todo_due <= now:
+                    styled_due = '{}{}{}'.format(_RED_PREFIX, due, _RESET)
 
             recurring = '⟳' if todo.is_recurring else ''
 
             if hide_list:
-                summary = "{} {}".format(
+                summary = styled_summary = "{} {}".format(
                             todo.summary,
                             percent,
                         )
             else:
-                summary = "{} {}{}".format(
+                summary = "{} @{}{}".format(
                             todo.summary,
-                            self.format_database(todo.list),
+                            todo.list.name,
+                            percent,
+                        )
+                styled_summary = "{} {}{}".format(
+                            todo.summary,
+                            format_database(todo.list),
                             percent,
                         )
 
+            todo_id = str(todo.id) if todo.id is not None else ''
             table.append([
-                todo.id,
-                "[{}]".format(completed),
-                priority,
-                '{} {}'.format(due, recurring),
-                summary,
+                (todo_id, todo_id),
+                (completed, completed),
+                (priority, priority),
+                (
+                    '{} {}'.format(due, recurring),
+                    '{} {}'.format(styled_due, recurring),
+                ),
+                (summary, styled_summary),
             ])
 
-        return tabulate(table, tablefmt='plain')
+        return _format_table(table)
 
     def _columnize_text(self, label, text):
         """Display text, split text by line-endings, on multiple colums,"""
@@ -110,9 +323,9 @@ class DefaultFormatter:
         rows = []
 
         if lst:
-            rows.append([label, lst[0]])
+            rows.append([(label, label), (lst[0], lst[0])])
             for line in lst[1:]:
-                rows.append([None, line])
+                rows.append([('', ''), (line, line)])
 
         return rows
 
@@ -128,7 +341,7 @@ class DefaultFormatter:
 
         if extra_rows:
             return '{}\n\n{}'.format(
-                self.compact(todo), tabulate(extra_rows, tablefmt='plain')
+                self.compact(todo), _format_table(extra_rows, right_align=())
             )
         return self.compact(todo)
 
@@ -136,46 +349,36 @@ class DefaultFormatter:
         if not dt:
             return ''
         elif isinstance(dt, datetime.datetime):
+            if self._fast_datetime:
+                return '{:04d}-{:02d}-{:02d} {:02d}:{:02d}'.format(
+                    dt.year, dt.month, dt.day, dt.hour, dt.minute
+                )
             return dt.strftime(self.datetime_format)
         elif isinstance(dt, datetime.date):
+            if self._fast_date:
+                return '{:04d}-{:02d}-{:02d}'.format(
+                    dt.year, dt.month, dt.day
+                )
             return dt.strftime(self.date_format)
 
     def parse_priority(self, priority):
-        if priority is None or priority == '':
-            return None
-        if priority == 'low':
-            return 9
-        elif priority == 'medium':
-            return 5
-        elif priority == 'high':
-            return 4
-        elif priority == 'none':
-            return 0
-        else:
+        rv = _PRIORITY_VALUES.get(priority, ValueError)
+        if rv is ValueError:
             raise ValueError(
                 'Priority has to be one of low, medium,'
                 ' high or none'
             )
+        return rv
 
     def format_priority(self, priority):
-        if not priority:
-            return 'none'
-        elif 1 <= priority <= 4:
-            return 'high'
-        elif priority == 5:
-            return 'medium'
-        elif 6 <= priority <= 9:
-            return 'low'
+        priority = priority or 0
+        if 0 <= priority <= 9:
+            return _PRIORITY_NAMES[priority]
 
     def format_priority_compact(self, priority):
-        if not priority:
-            return ''
-        elif 1 <= priority <= 4:
-            return "!!!"
-        elif priority == 5:
-            return "!!"
-        elif 6 <= priority <= 9:
-            return "!"
+        priority = priority or 0
+        if 0 <= priority <= 9:
+            return _PRIORITY_COMPACT[priority]
 
     def parse_datetime(self, dt):
         if not dt:
@@ -190,66 +393,93 @@ class DefaultFormatter:
 
     def _parse_datetime_naive(self, dt):
         """Parse dt and returns a naive datetime or a date"""
-        try:
-            return datetime.datetime.strptime(dt, self.datetime_format)
-        except ValueError:
-            pass
-
-        try:
-            return datetime.datetime.strptime(dt, self.date_format).date()
-        except ValueError:
-            pass
-
-        try:
-            return datetime.datetime.combine(
-                self.now.date(),
-                datetime.datetime.strptime(dt, self.time_format).time()
-            )
-        except ValueError:
-            pass
-
-        rv, pd_ctx = self._parsedatetime_calendar.parse(dt)
-        if not pd_ctx.hasDateOrTime:
+        if self._iso_formats:
+            try_datetime = _ISO_DATETIME_RE.fullmatch(dt)
+            try_date = _ISO_DATE_RE.fullmatch(dt)
+            try_time = _ISO_TIME_RE.fullmatch(dt)
+        else:
+            try_datetime = try_date = try_time = True
+
+        if try_datetime:
+            try:
+                return _cached_strptime(dt, self.datetime_format)
+            except ValueError:
+                pass
+
+        if try_date:
+            try:
+                return _cached_strptime(dt, self.date_format).date()
+            except ValueError:
+                pass
+
+        if try_time:
+            try:
+                return datetime.datetime.combine(
+                    self.now.date(),
+                    _cached_strptime(dt, self.time_format).time()
+                )
+            except ValueError:
+                pass
+
+        rv = _cached_pdt_parse(dt, time.localtime())
+        if rv is None:
             raise ValueError('Time description not recognized: {}'.format(dt))
-        return datetime.datetime.fromtimestamp(mktime(rv))
+        return rv
 
     def format_database(self, database):
-        return '{}@{}'.format(
-            rgb_to_ansi(database.colour) or '', click.style(database.name)
-        )
+        name = self._styled_database_names.get(database.name)
+        if name is None:
+            name = click.style(database.name)
+            self._styled_database_names[database.name] = name
+
+        return '{}@{}'.format(rgb_to_ansi(database.colour) or '', name)
 
 
 class HumanizedFormatter(DefaultFormatter):
+    __slots__ = ()
+
     def format_datetime(self, dt):
         if not dt:
             return ''
 
-        rv = humanize.naturaltime(self.now - dt)
-        if ' from now' in rv:
-            rv = 'in {}'.format(rv[:-9])
-
-        return rv
+        delta = self.now - dt
+        future = delta < datetime.timedelta(0)
+        return _humanize_seconds(int(abs(delta).total_seconds()), future)
 
 
 class PorcelainFormatter(DefaultFormatter):
+    __slots__ = ()
+
     def _todo_as_dict(self, todo):
-        return dict(
-            completed=todo.is_completed,
-            due=self.format_datetime(todo.due),
-            id=todo.id,
-            list=todo.list.name,
-            percent=todo.percent_complete,
-            summary=todo.summary,
-            priority=todo.priority,
-            location=todo.location,
-        )
+        (
+            completed,
+            due,
+            todo_id,
+            list_name,
+            percent,
+            summary,
+            priority,
+            location,
+        ) = _porcelain_attributes(todo)
+
+        return {
+            'completed': completed,
+            'due': self.format_datetime(due),
+            'id': todo_id,
+            'list': list_name,
+            'percent': percent,
+            'summary': summary,
+            'priority': priority,
+            'location': location,
+        }
 
     def compact(self, todo):
-        return json.dumps(self._todo_as_dict(todo), indent=4, sort_keys=True)
+        return _porcelain_encoder.encode(self._todo_as_dict(todo))
 
     def compact_multiple(self, todos, hide_list=False):
-        data = [self._todo_as_dict(todo) for todo in todos]
-        return json.dumps(data, indent=4, sort_keys=True)
+        todo_as_dict = self._todo_as_dict
+        data = [todo_as_dict(todo) for todo in todos]
+        return _porcelain_encoder.encode(data)
 
     def simple_action(self, action, todo):
         return self.compact(todo)
@@ -271,7 +501,7 @@ class PorcelainFormatter(DefaultFormatter):
     def format_datetime(self, date):
         if date:
             if not hasattr(date, 'timestamp'):
-                date = datetime.datetime.fromordinal(date.toordinal())
+                return _date_timestamp(date)
             return int(date.timestamp())
         else:
             return None